@@ -6,7 +6,21 @@ https://duneanalytics.notion.site/API-Documentation-1b93d16e0fa941398e15047f643e
 from __future__ import annotations
 
 import logging.config
-from typing import Dict
+import random
+from typing import Dict, Optional, Tuple
+
+# Class level settings of `BaseDuneClient` (which subclasses may override)
+SHARED_SETTINGS = (
+    "BASE_URL",
+    "API_PATH",
+    "DEFAULT_TIMEOUT",
+    "CONNECT_TIMEOUT",
+    "MAX_RETRIES",
+    "RETRY_BACKOFF",
+    "RETRY_JITTER",
+    "PING_BACKOFF",
+    "LONG_POLL_WAIT",
+)
 
 
 # pylint: disable=too-few-public-methods
@@ -18,14 +32,47 @@ class BaseDuneClient:
 
     BASE_URL = "https://api.dune.com"
     API_PATH = "/api/v1"
+    # Seconds to wait for the server to send data (applies to each read, not in total)
     DEFAULT_TIMEOUT = 10
+    # Seconds to wait for establishing a connection, kept short to fail fast
+    CONNECT_TIMEOUT = 5.0
+    # Retries of rate-limited (and, for GETs, gateway error) responses,
+    # backing off `RETRY_BACKOFF * 2 ** n` seconds plus up to `RETRY_JITTER` seconds
+    MAX_RETRIES = 5
+    RETRY_BACKOFF = 0.5
+    RETRY_JITTER = 0.5
+    # Growth factor of the status polling interval (see `initial_ping_frequency`)
+    PING_BACKOFF = 1.5
+    # Maximum seconds a long-poll status request is held open by the server
+    LONG_POLL_WAIT = 30
 
-    def __init__(self, api_key: str, performance: str = "medium"):
+    def __init__(
+        self,
+        api_key: str,
+        performance: str = "medium",
+        supports_long_poll: bool = False,
+    ):
         self.token = api_key
         self.performance = performance
+        self.supports_long_poll = supports_long_poll
         self.logger = logging.getLogger(__name__)
         logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s %(message)s")
 
+    def timeouts(self) -> Tuple[float, float]:
+        """Return (connect, read) timeouts for requests to the Dune API"""
+        return self.CONNECT_TIMEOUT, self.DEFAULT_TIMEOUT
+
+    def retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Seconds to wait before retry number `attempt` (starting at 0):
+        the server's `Retry-After` (in seconds) when given, else a jittered backoff
+        """
+        if retry_after is not None and retry_after.isdigit():
+            return float(retry_after)
+        return self.RETRY_BACKOFF * 2.0**attempt + random.uniform(
+            0, self.RETRY_JITTER
+        )
+
     def default_headers(self) -> Dict[str, str]:
         """Return default headers containing Dune Api token"""
         return {"x-dune-api-key": self.token}
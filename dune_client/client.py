@@ -5,14 +5,19 @@ https://duneanalytics.notion.site/API-Documentation-1b93d16e0fa941398e15047f643e
 """
 from __future__ import annotations
 
+import asyncio
+import importlib
+import random
 import time
-from io import BytesIO
-from typing import Any, Optional, Union
+from collections import OrderedDict
+from typing import IO, Any, Dict, List, Optional, Tuple, Union, cast
 
-import requests
-from requests import Response, JSONDecodeError
+from requests import JSONDecodeError, Response, Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from dune_client.base_client import BaseDuneClient
+from dune_client.base_client import SHARED_SETTINGS, BaseDuneClient
+from dune_client.client_async import AsyncDuneClient
 from dune_client.interface import DuneInterface
 from dune_client.models import (
     ExecutionResponse,
@@ -25,6 +30,54 @@ from dune_client.models import (
 )
 
 from dune_client.query import Query
+from dune_client.util import json_dumps
+
+# Optional dependencies (pandas, pyarrow), imported on first use
+_optional_modules: Dict[str, Any] = {}
+
+
+def _import_optional(module: str) -> Any:
+    """Imports optional `module` once, raising a helpful error when it isn't installed"""
+    if module not in _optional_modules:
+        try:
+            _optional_modules[module] = importlib.import_module(module)
+        except ImportError as exc:
+            package = module.split(".", maxsplit=1)[0]
+            raise ImportError(
+                f"dependency failure, {package} is required but missing"
+            ) from exc
+    return _optional_modules[module]
+
+
+class _DuneRetry(Retry):
+    """
+    Retries GETs on rate limits and gateway errors, but POSTs only on rate limits:
+    a POST (e.g. execute) answered with a gateway error may still have been accepted,
+    so resending it could start a duplicate (billed) execution.
+    Backoffs are extended by up to `jitter` seconds, so that clients
+    rate limited together don't all retry at the same time.
+    """
+
+    def __init__(self, *args: Any, jitter: float = 0.0, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.jitter = jitter
+
+    def new(self, **kw: Any) -> _DuneRetry:
+        kw.setdefault("jitter", self.jitter)
+        return super().new(**kw)
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return backoff + random.uniform(0, self.jitter)
+
+    def is_retry(
+        self, method: str, status_code: int, has_retry_after: bool = False
+    ) -> bool:
+        if method.upper() == "POST":
+            return status_code == 429 and bool(self.total)
+        return super().is_retry(method, status_code, has_retry_after)
 
 
 class DuneClient(DuneInterface, BaseDuneClient):
@@ -33,6 +86,69 @@ class DuneClient(DuneInterface, BaseDuneClient):
     combining the use of endpoints (e.g. refresh)
     """
 
+    # Maximum number of entries kept in the `get_latest_result` cache
+    LATEST_CACHE_SIZE = 128
+
+    def __init__(
+        self,
+        api_key: str,
+        performance: str = "medium",
+        latest_cache_ttl: float = 0.0,
+        supports_long_poll: bool = False,
+    ):
+        """
+        api_key - Dune API key
+        latest_cache_ttl - seconds for which `get_latest_result` responses are
+        served from memory (per query id & parameters). Disabled by default.
+        supports_long_poll - whether the API (e.g. a proxy in front of it) holds
+        `execution/{job_id}/status?wait=1&max_wait=...` requests open until the
+        execution state changes. When enabled, `refresh` waits on those instead of
+        sleeping between status requests (but still backs off when answered early).
+        Dune's public API doesn't support this, so it's off by default.
+        """
+        super().__init__(
+            api_key=api_key,
+            performance=performance,
+            supports_long_poll=supports_long_poll,
+        )
+        self.latest_cache_ttl = latest_cache_ttl
+        self._latest_cache: OrderedDict[
+            Tuple[int, Optional[Tuple[Tuple[str, str], ...]]],
+            Tuple[float, ResultsResponse],
+        ] = OrderedDict()
+        self._api_url = f"{self.BASE_URL}{self.API_PATH}"
+        # A single session keeps connections to the API alive between requests,
+        # so that polling in `refresh` doesn't pay a new TCP & TLS handshake each time.
+        self._session = Session()
+        self._session.headers.update(self.default_headers())
+        # Transient errors (rate limits & gateway errors) are retried with jittered
+        # exponential backoff, waiting for `Retry-After` when the API sends it.
+        # Once retries are exhausted the last response is handled as usual.
+        retry = _DuneRetry(
+            total=self.MAX_RETRIES,
+            backoff_factor=self.RETRY_BACKOFF,
+            jitter=self.RETRY_JITTER,
+            status_forcelist=[429, 502, 503, 504],
+            # Only GETs are resent after connection/read errors (see `_DuneRetry`)
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+        # Both schemes, so that e.g. a plain http `BASE_URL` (proxy) is retried too
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def close(self) -> None:
+        """Closes the underlying session, releasing all pooled connections"""
+        self._session.close()
+
+    def __enter__(self) -> DuneClient:
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
+
     def _handle_response(
         self,
         response: Response,
@@ -40,7 +156,7 @@ class DuneClient(DuneInterface, BaseDuneClient):
         try:
             # Some responses can be decoded and converted to DuneErrors
             response_json = response.json()
-            self.logger.debug(f"received response {response_json}")
+            self.logger.debug("received response %s", response_json)
             return response_json
         except JSONDecodeError as err:
             # Others can't. Only raise HTTP error for not decodable errors
@@ -48,27 +164,28 @@ class DuneClient(DuneInterface, BaseDuneClient):
             raise ValueError("Unreachable since previous line raises") from err
 
     def _route_url(self, route: str) -> str:
-        return f"{self.BASE_URL}{self.API_PATH}/{route}"
+        return f"{self._api_url}/{route}"
 
     def _get(self, route: str, params: Optional[Any] = None) -> Any:
         url = self._route_url(route)
-        self.logger.debug(f"GET received input url={url}")
-        response = requests.get(
+        self.logger.debug("GET received input url=%s", url)
+        response = self._session.get(
             url,
-            headers={"x-dune-api-key": self.token},
-            timeout=self.DEFAULT_TIMEOUT,
+            timeout=self.timeouts(),
             params=params,
         )
         return self._handle_response(response)
 
     def _post(self, route: str, params: Any) -> Any:
         url = self._route_url(route)
-        self.logger.debug(f"POST received input url={url}, params={params}")
-        response = requests.post(
+        self.logger.debug("POST received input url=%s, params=%s", url, params)
+        # Serialized once up front, so retries of this request resend the same bytes
+        body = json_dumps(params) if params is not None else None
+        response = self._session.post(
             url=url,
-            json=params,
-            headers={"x-dune-api-key": self.token},
-            timeout=self.DEFAULT_TIMEOUT,
+            data=body,
+            headers={"Content-Type": "application/json"} if body is not None else None,
+            timeout=self.timeouts(),
         )
         return self._handle_response(response)
 
@@ -77,16 +194,15 @@ class DuneClient(DuneInterface, BaseDuneClient):
     ) -> ExecutionResponse:
         """Post's to Dune API for execute `query`"""
         self.logger.info(
-            f"executing {query.query_id} on {performance or self.performance} cluster"
+            "executing %s on %s cluster",
+            query.query_id,
+            performance or self.performance,
         )
+        params = query.request_format()
+        params["performance"] = performance or self.performance
         response_json = self._post(
             route=f"query/{query.query_id}/execute",
-            params={
-                "query_parameters": {
-                    p.key: p.to_dict()["value"] for p in query.parameters()
-                },
-                "performance": performance or self.performance,
-            },
+            params=params,
         )
         try:
             return ExecutionResponse.from_dict(response_json)
@@ -103,6 +219,27 @@ class DuneClient(DuneInterface, BaseDuneClient):
         except KeyError as err:
             raise DuneError(response_json, "ExecutionStatusResponse", err) from err
 
+    def _wait_for_completion(
+        self, job_id: str, max_wait: Optional[float] = None
+    ) -> ExecutionStatusResponse:
+        """
+        Long-poll GET of the status for `job_id`:
+        returns as soon as the execution state changes (or after `max_wait` seconds)
+        """
+        max_wait = max_wait or self.LONG_POLL_WAIT
+        url = self._route_url(f"execution/{job_id}/status")
+        self.logger.debug("GET (long-poll) received input url=%s", url)
+        response = self._session.get(
+            url,
+            params={"wait": 1, "max_wait": max_wait},
+            timeout=(self.CONNECT_TIMEOUT, max_wait + self.DEFAULT_TIMEOUT),
+        )
+        response_json = self._handle_response(response)
+        try:
+            return ExecutionStatusResponse.from_dict(response_json)
+        except KeyError as err:
+            raise DuneError(response_json, "ExecutionStatusResponse", err) from err
+
     def get_result(self, job_id: str) -> ResultsResponse:
         """GET results from Dune API for `job_id` (aka `execution_id`)"""
         response_json = self._get(route=f"execution/{job_id}/results")
@@ -118,16 +255,29 @@ class DuneClient(DuneInterface, BaseDuneClient):
         this API only returns the raw data in CSV format, it is faster & lighterweight
         use this method for large results where you want lower CPU and memory overhead
         if you need metadata information use get_results() or get_status()
+
+        The returned data is streamed from the network (it is not buffered in memory),
+        so it can only be read once; close it (or use it as a context manager)
+        if it isn't read to the end.
+        """
+        response = self._get_result_csv_stream(job_id)
+        return ExecutionResultCSV(data=cast(IO[bytes], response.raw))
+
+    def _get_result_csv_stream(self, job_id: str) -> Response:
+        """
+        Streamed GET of CSV results for `job_id`:
+        the body is left unread so consumers can parse `response.raw` incrementally
         """
         url = self._route_url(f"execution/{job_id}/results/csv")
-        self.logger.debug(f"GET CSV received input url={url}")
-        response = requests.get(
-            url,
-            headers={"x-dune-api-key": self.token},
-            timeout=self.DEFAULT_TIMEOUT,
-        )
-        response.raise_for_status()
-        return ExecutionResultCSV(data=BytesIO(response.content))
+        self.logger.debug("GET CSV received input url=%s", url)
+        response = self._session.get(url, timeout=self.timeouts(), stream=True)
+        if not response.ok:
+            # release the (unread) streamed connection back to the pool before raising
+            response.close()
+            response.raise_for_status()
+        # transparently decompress (e.g. gzip) while the body is being read
+        response.raw.decode_content = True
+        return response
 
     def get_latest_result(self, query: Union[Query, str, int]) -> ResultsResponse:
         """
@@ -135,26 +285,41 @@ class DuneClient(DuneInterface, BaseDuneClient):
 
         :param query: :class:`Query` object OR query id as string | int
 
+        When `latest_cache_ttl` is set, cache hits return the very same
+        (mutable) `ResultsResponse` object: changing e.g. its rows changes the cached copy.
+
         https://dune.com/docs/api/api-reference/latest_results/
         """
         if isinstance(query, Query):
-            params = {
-                f"params.{p.key}": p.to_dict()["value"] for p in query.parameters()
-            }
+            params = {f"params.{p.key}": p.value_str() for p in query.parameters()}
             query_id = query.query_id
         else:
             params = None
             query_id = int(query)
 
+        cache_key = (query_id, tuple(sorted(params.items())) if params else None)
+        if self.latest_cache_ttl > 0 and cache_key in self._latest_cache:
+            cached_at, cached = self._latest_cache[cache_key]
+            if time.monotonic() - cached_at < self.latest_cache_ttl:
+                self._latest_cache.move_to_end(cache_key)
+                return cached
+            del self._latest_cache[cache_key]
+
         response_json = self._get(
             route=f"query/{query_id}/results",
             params=params,
         )
         try:
-            return ResultsResponse.from_dict(response_json)
+            result = ResultsResponse.from_dict(response_json)
         except KeyError as err:
             raise DuneError(response_json, "ResultsResponse", err) from err
 
+        if self.latest_cache_ttl > 0:
+            self._latest_cache[cache_key] = (time.monotonic(), result)
+            if len(self._latest_cache) > self.LATEST_CACHE_SIZE:
+                self._latest_cache.popitem(last=False)
+        return result
+
     def cancel_execution(self, job_id: str) -> bool:
         """POST Execution Cancellation to Dune API for `job_id` (aka `execution_id`)"""
         response_json = self._post(route=f"execution/{job_id}/cancel", params=None)
@@ -170,14 +335,30 @@ class DuneClient(DuneInterface, BaseDuneClient):
         query: Query,
         ping_frequency: int = 5,
         performance: Optional[str] = None,
+        initial_ping_frequency: Optional[float] = None,
     ) -> str:
         job_id = self.execute(query=query, performance=performance).execution_id
         status = self.get_status(job_id)
-        while status.state not in ExecutionState.terminal_states():
+        sleep = min(initial_ping_frequency or ping_frequency, ping_frequency)
+        terminal_states = ExecutionState.terminal_states()
+        while status.state not in terminal_states:
             self.logger.info(
-                f"waiting for query execution {job_id} to complete: {status}"
+                "waiting for query execution %s to complete: %s", job_id, status
             )
-            time.sleep(ping_frequency)
+            if self.supports_long_poll:
+                started = time.monotonic()
+                previous_state = status.state
+                status = self._wait_for_completion(job_id)
+                waited = time.monotonic() - started
+                if status.state != previous_state or waited >= sleep:
+                    continue
+                # Answered early without a state change (e.g. `wait` isn't honoured):
+                # fall back to the ping interval, rather than busy looping the API.
+                time.sleep(sleep - waited)
+                sleep = min(sleep * self.PING_BACKOFF, ping_frequency)
+                continue
+            time.sleep(sleep)
+            sleep = min(sleep * self.PING_BACKOFF, ping_frequency)
             status = self.get_status(job_id)
         if status.state == ExecutionState.FAILED:
             self.logger.error(status)
@@ -190,24 +371,74 @@ class DuneClient(DuneInterface, BaseDuneClient):
         query: Query,
         ping_frequency: int = 5,
         performance: Optional[str] = None,
+        initial_ping_frequency: Optional[float] = None,
     ) -> ResultsResponse:
         """
         Executes a Dune `query`, waits until execution completes,
         fetches and returns the results.
         Sleeps `ping_frequency` seconds between each status request.
+        When `initial_ping_frequency` is given, the first status request happens
+        after that many seconds and the interval grows up to `ping_frequency`
+        (an `initial_ping_frequency` above `ping_frequency` is capped to it).
         """
         job_id = self._refresh(
             query,
             ping_frequency=ping_frequency,
             performance=performance,
+            initial_ping_frequency=initial_ping_frequency,
         )
         return self.get_result(job_id)
 
+    def refresh_many(
+        self,
+        queries: List[Query],
+        ping_frequency: int = 5,
+        performance: Optional[str] = None,
+        max_concurrency: int = 3,
+        initial_ping_frequency: Optional[float] = None,
+    ) -> List[ResultsResponse]:
+        """
+        Executes all `queries` concurrently and returns their results
+        (in the same order as `queries`).
+        All status polls are serviced from a single event loop,
+        with at most `max_concurrency` executions (and parallel requests) in flight.
+        For non-pro accounts Dune allows only up to 3 parallel requests.
+        `ping_frequency` and `initial_ping_frequency` are as in `refresh`.
+
+        This uses an `AsyncDuneClient` with this client's settings. Note that it only
+        retries rate-limited (429) responses, not gateway errors.
+
+        Can't be called from within a running event loop,
+        use `AsyncDuneClient.concurrent_refresh` there instead.
+        """
+
+        async def _refresh_many() -> List[ResultsResponse]:
+            client = AsyncDuneClient(
+                self.token,
+                connection_limit=max_concurrency,
+                performance=self.performance,
+                supports_long_poll=self.supports_long_poll,
+            )
+            # Carry over (e.g. subclass) overrides of the shared client settings
+            for setting in SHARED_SETTINGS:
+                setattr(client, setting, getattr(self, setting))
+            async with client:
+                return await client.concurrent_refresh(
+                    queries,
+                    ping_frequency=ping_frequency,
+                    performance=performance,
+                    max_concurrency=max_concurrency,
+                    initial_ping_frequency=initial_ping_frequency,
+                )
+
+        return asyncio.run(_refresh_many())
+
     def refresh_csv(
         self,
         query: Query,
         ping_frequency: int = 5,
         performance: Optional[str] = None,
+        initial_ping_frequency: Optional[float] = None,
     ) -> ExecutionResultCSV:
         """
         Executes a Dune query, waits till execution completes,
@@ -218,6 +449,7 @@ class DuneClient(DuneInterface, BaseDuneClient):
             query,
             ping_frequency=ping_frequency,
             performance=performance,
+            initial_ping_frequency=initial_ping_frequency,
         )
         return self.get_result_csv(job_id)
 
@@ -228,13 +460,24 @@ class DuneClient(DuneInterface, BaseDuneClient):
         Execute a Dune Query, waits till execution completes,
         fetched and returns the result as a Pandas DataFrame
 
-        This is a convenience method that uses refresh_csv underneath
+        This is a convenience method that uses refresh_csv underneath,
+        streaming the CSV results into pandas as they are downloaded
         """
-        try:
-            import pandas  # type: ignore # pylint: disable=import-outside-toplevel
-        except ImportError as exc:
-            raise ImportError(
-                "dependency failure, pandas is required but missing"
-            ) from exc
-        data = self.refresh_csv(query, performance=performance).data
-        return pandas.read_csv(data)
+        pandas = _import_optional("pandas")
+        with self.refresh_csv(query, performance=performance) as result:
+            return pandas.read_csv(result.data, engine="c")
+
+    def refresh_arrow(self, query: Query, performance: Optional[str] = None) -> Any:
+        """
+        Execute a Dune Query, waits till execution completes,
+        fetched and returns the result as a pyarrow Table
+
+        The CSV results are streamed straight into pyarrow's (multithreaded) reader,
+        without building intermediate python objects or pandas blocks
+        """
+        csv = _import_optional("pyarrow.csv")
+        with self.refresh_csv(query, performance=performance) as result:
+            return csv.read_csv(
+                result.data,
+                read_options=csv.ReadOptions(use_threads=True, block_size=1 << 20),
+            )
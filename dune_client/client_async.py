@@ -5,7 +5,8 @@ https://duneanalytics.notion.site/API-Documentation-1b93d16e0fa941398e15047f643e
 """
 from __future__ import annotations
 import asyncio
-from typing import Any, Optional, Union
+import time
+from typing import Any, List, Optional, Union
 
 from aiohttp import (
     ClientSession,
@@ -38,14 +39,27 @@ class AsyncDuneClient(BaseDuneClient):
     _connection_limit = 3
 
     def __init__(
-        self, api_key: str, connection_limit: int = 3, performance: str = "medium"
+        self,
+        api_key: str,
+        connection_limit: int = 3,
+        performance: str = "medium",
+        supports_long_poll: bool = False,
     ):
         """
         api_key - Dune API key
         connection_limit - number of parallel requests to execute.
         For non-pro accounts Dune allows only up to 3 requests but that number can be increased.
+        All requests (e.g. the status polls of `concurrent_refresh`) share this pool
+        of keep-alive connections, queueing for a free one rather than opening more.
+        Rate-limited (429) responses are retried up to `MAX_RETRIES` times,
+        gateway errors are not.
+        supports_long_poll - see `DuneClient`
         """
-        super().__init__(api_key=api_key, performance=performance)
+        super().__init__(
+            api_key=api_key,
+            performance=performance,
+            supports_long_poll=supports_long_poll,
+        )
         self._connection_limit = connection_limit
         self._session: Optional[ClientSession] = None
 
@@ -54,7 +68,10 @@ class AsyncDuneClient(BaseDuneClient):
         return ClientSession(
             connector=conn,
             base_url=self.BASE_URL,
-            timeout=ClientTimeout(total=self.DEFAULT_TIMEOUT),
+            headers=self.default_headers(),
+            timeout=ClientTimeout(
+                sock_connect=self.CONNECT_TIMEOUT, sock_read=self.DEFAULT_TIMEOUT
+            ),
         )
 
     async def connect(self) -> None:
@@ -80,33 +97,44 @@ class AsyncDuneClient(BaseDuneClient):
         try:
             # Some responses can be decoded and converted to DuneErrors
             response_json = await response.json()
-            self.logger.debug(f"received response {response_json}")
+            self.logger.debug("received response %s", response_json)
             return response_json
         except ContentTypeError as err:
             # Others can't. Only raise HTTP error for not decodable errors
             response.raise_for_status()
             raise ValueError("Unreachable since previous line raises") from err
 
-    async def _get(self, url: str, params: Optional[Any] = None) -> Any:
+    async def _request(self, method: str, url: str, **kwargs: Any) -> ClientResponse:
+        """
+        Sends the request, retrying (with backoff or the server's `Retry-After`)
+        while rate-limited: a 429 means the request was rejected,
+        so resending it can't e.g. start a duplicate execution.
+        """
         if self._session is None:
             raise ValueError("Client is not connected; call `await cl.connect()`")
-        self.logger.debug(f"GET received input url={url}")
-        response = await self._session.get(
-            url=f"{self.API_PATH}{url}",
-            headers=self.default_headers(),
-            params=params,
-        )
+        attempt = 0
+        while True:
+            response = await self._session.request(
+                method, url=f"{self.API_PATH}{url}", **kwargs
+            )
+            if response.status != 429 or attempt >= self.MAX_RETRIES:
+                return response
+            response.release()
+            delay = self.retry_delay(attempt, response.headers.get("Retry-After"))
+            self.logger.info(
+                "rate limited on %s %s, retrying in %.2fs", method, url, delay
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _get(self, url: str, params: Optional[Any] = None) -> Any:
+        self.logger.debug("GET received input url=%s", url)
+        response = await self._request("GET", url, params=params)
         return await self._handle_response(response)
 
     async def _post(self, url: str, params: Any) -> Any:
-        if self._session is None:
-            raise ValueError("Client is not connected; call `await cl.connect()`")
-        self.logger.debug(f"POST received input url={url}, params={params}")
-        response = await self._session.post(
-            url=f"{self.API_PATH}{url}",
-            json=params,
-            headers=self.default_headers(),
-        )
+        self.logger.debug("POST received input url=%s, params=%s", url, params)
+        response = await self._request("POST", url, json=params)
         return await self._handle_response(response)
 
     async def execute(
@@ -117,7 +145,9 @@ class AsyncDuneClient(BaseDuneClient):
         params["performance"] = performance or self.performance
 
         self.logger.info(
-            f"executing {query.query_id} on {performance or self.performance} cluster"
+            "executing %s on %s cluster",
+            query.query_id,
+            performance or self.performance,
         )
         response_json = await self._post(
             url=f"/query/{query.query_id}/execute",
@@ -138,6 +168,30 @@ class AsyncDuneClient(BaseDuneClient):
         except KeyError as err:
             raise DuneError(response_json, "ExecutionStatusResponse", err) from err
 
+    async def _wait_for_completion(
+        self, job_id: str, max_wait: Optional[float] = None
+    ) -> ExecutionStatusResponse:
+        """
+        Long-poll GET of the status for `job_id` (see `DuneClient._wait_for_completion`)
+        """
+        max_wait = max_wait or self.LONG_POLL_WAIT
+        url = f"/execution/{job_id}/status"
+        self.logger.debug("GET (long-poll) received input url=%s", url)
+        response = await self._request(
+            "GET",
+            url,
+            params={"wait": 1, "max_wait": max_wait},
+            timeout=ClientTimeout(
+                sock_connect=self.CONNECT_TIMEOUT,
+                sock_read=max_wait + self.DEFAULT_TIMEOUT,
+            ),
+        )
+        response_json = await self._handle_response(response)
+        try:
+            return ExecutionStatusResponse.from_dict(response_json)
+        except KeyError as err:
+            raise DuneError(response_json, "ExecutionStatusResponse", err) from err
+
     async def get_result(self, job_id: str) -> ResultsResponse:
         """GET results from Dune API for `job_id` (aka `execution_id`)"""
         response_json = await self._get(url=f"/execution/{job_id}/results")
@@ -153,9 +207,7 @@ class AsyncDuneClient(BaseDuneClient):
         https://dune.com/docs/api/api-reference/latest_results/
         """
         if isinstance(query, Query):
-            params = {
-                f"params.{p.key}": p.to_dict()["value"] for p in query.parameters()
-            }
+            params = {f"params.{p.key}": p.value_str() for p in query.parameters()}
             query_id = query.query_id
         else:
             params = None
@@ -180,28 +232,99 @@ class AsyncDuneClient(BaseDuneClient):
         except KeyError as err:
             raise DuneError(response_json, "CancellationResponse", err) from err
 
-    async def refresh(
+    async def _refresh(
         self,
         query: Query,
         ping_frequency: int = 5,
         performance: Optional[str] = None,
-    ) -> ResultsResponse:
-        """
-        Executes a Dune `query`, waits until execution completes,
-        fetches and returns the results.
-        Sleeps `ping_frequency` seconds between each status request.
-        """
+        initial_ping_frequency: Optional[float] = None,
+    ) -> str:
         job_id = (await self.execute(query=query, performance=performance)).execution_id
         status = await self.get_status(job_id)
-        while status.state not in ExecutionState.terminal_states():
+        sleep = min(initial_ping_frequency or ping_frequency, ping_frequency)
+        terminal_states = ExecutionState.terminal_states()
+        while status.state not in terminal_states:
             self.logger.info(
-                f"waiting for query execution {job_id} to complete: {status}"
+                "waiting for query execution %s to complete: %s", job_id, status
             )
-            await asyncio.sleep(ping_frequency)
+            if self.supports_long_poll:
+                started = time.monotonic()
+                previous_state = status.state
+                status = await self._wait_for_completion(job_id)
+                waited = time.monotonic() - started
+                if status.state != previous_state or waited >= sleep:
+                    continue
+                # Answered early without a state change (e.g. `wait` isn't honoured):
+                # fall back to the ping interval, rather than busy looping the API.
+                await asyncio.sleep(sleep - waited)
+                sleep = min(sleep * self.PING_BACKOFF, ping_frequency)
+                continue
+            await asyncio.sleep(sleep)
+            sleep = min(sleep * self.PING_BACKOFF, ping_frequency)
             status = await self.get_status(job_id)
-
-        full_response = await self.get_result(job_id)
         if status.state == ExecutionState.FAILED:
             self.logger.error(status)
             raise QueryFailed(f"{status}. Perhaps your query took too long to run!")
-        return full_response
+
+        return job_id
+
+    async def refresh(
+        self,
+        query: Query,
+        ping_frequency: int = 5,
+        performance: Optional[str] = None,
+        initial_ping_frequency: Optional[float] = None,
+    ) -> ResultsResponse:
+        """
+        Executes a Dune `query`, waits until execution completes,
+        fetches and returns the results.
+        Sleeps `ping_frequency` seconds between each status request.
+        When `initial_ping_frequency` is given, the first status request happens
+        after that many seconds and the interval grows up to `ping_frequency`
+        (an `initial_ping_frequency` above `ping_frequency` is capped to it).
+        """
+        job_id = await self._refresh(
+            query,
+            ping_frequency=ping_frequency,
+            performance=performance,
+            initial_ping_frequency=initial_ping_frequency,
+        )
+        return await self.get_result(job_id)
+
+    async def concurrent_refresh(
+        self,
+        queries: List[Query],
+        ping_frequency: int = 5,
+        performance: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        initial_ping_frequency: Optional[float] = None,
+    ) -> List[ResultsResponse]:
+        """
+        Refreshes all `queries` concurrently, overlapping their execution wait times.
+        At most `max_concurrency` (default: `connection_limit`) executions
+        are in flight at once.
+        Results are returned in the same order as `queries`.
+        `ping_frequency` and `initial_ping_frequency` are as in `refresh`.
+        If any refresh fails, the remaining ones are cancelled
+        before its exception is raised.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self._connection_limit)
+
+        async def _bounded_refresh(query: Query) -> ResultsResponse:
+            async with semaphore:
+                return await self.refresh(
+                    query,
+                    ping_frequency=ping_frequency,
+                    performance=performance,
+                    initial_ping_frequency=initial_ping_frequency,
+                )
+
+        tasks = [asyncio.ensure_future(_bounded_refresh(q)) for q in queries]
+        try:
+            return list(await asyncio.gather(*tasks))
+        finally:
+            # Don't leave sibling refreshes polling (on a soon to be closed session)
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
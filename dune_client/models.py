@@ -7,8 +7,7 @@ import logging.config
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from io import BytesIO
-from typing import Optional, Any, Union, List, Dict
+from typing import IO, Optional, Any, Union, List, Dict
 
 from dateutil.parser import parse
 from dune_client.types import DuneRecord
@@ -34,7 +33,7 @@ class DuneError(Exception):
 
     def __init__(self, data: dict[str, str], response_class: str, err: KeyError):
         error_message = f"Can't build {response_class} from {data}"
-        log.error(f"{error_message} due to KeyError: {err}")
+        log.error("%s due to KeyError: %s", error_message, err)
         super().__init__(error_message)
 
 
@@ -50,17 +49,23 @@ class ExecutionState(Enum):
     FAILED = "QUERY_STATE_FAILED"
 
     @classmethod
-    def terminal_states(cls) -> set[ExecutionState]:
+    def terminal_states(cls) -> frozenset[ExecutionState]:
         """
         Returns the terminal states (i.e. when a query execution is no longer executing
         """
-        return {cls.COMPLETED, cls.CANCELLED, cls.FAILED}
+        return _TERMINAL_STATES
 
     def is_complete(self) -> bool:
         """Returns True is state is completed, otherwise False."""
         return self == ExecutionState.COMPLETED
 
 
+# Built once: defining it in the Enum body would make it a member
+_TERMINAL_STATES = frozenset(
+    {ExecutionState.COMPLETED, ExecutionState.CANCELLED, ExecutionState.FAILED}
+)
+
+
 @dataclass
 class ExecutionResponse:
     """
@@ -186,7 +191,19 @@ class ExecutionResultCSV:
         pandas.from_csv(data)
     """
 
-    data: BytesIO  # includes all CSV rows, including the header row.
+    # Any binary file-like object (e.g. BytesIO or a streamed HTTP body)
+    # includes all CSV rows, including the header row.
+    data: IO[bytes]
+
+    def close(self) -> None:
+        """Closes `data`, releasing the underlying connection when streamed"""
+        self.data.close()
+
+    def __enter__(self) -> ExecutionResultCSV:
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.close()
 
 
 @dataclass
@@ -198,7 +215,12 @@ class ExecutionResult:
 
     @classmethod
     def from_dict(cls, data: dict[str, RowData | MetaData]) -> ExecutionResult:
-        """Constructor from dictionary. See unit test for sample input."""
+        """
+        Constructor from dictionary. See unit test for sample input.
+        Rows are referenced as decoded (not copied or converted row by row),
+        so the cost of parsing large results is dominated by JSON decoding alone.
+        Results too large for that are better fetched as CSV (see `refresh_arrow`).
+        """
         assert isinstance(data["rows"], list)
         assert isinstance(data["metadata"], dict)
         return cls(
@@ -249,5 +271,5 @@ class ResultsResponse:
             assert self.result is not None, f"No Results on completed execution {self}"
             return self.result.rows
 
-        log.info(f"execution {self.state} returning empty list")
+        log.info("execution %s returning empty list", self.state)
         return []
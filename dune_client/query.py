@@ -43,6 +43,4 @@ class Query:
 
     def request_format(self) -> Dict[str, Union[Dict[str, str], str, None]]:
         """Transforms Query objects to params to pass in API"""
-        return {
-            "query_parameters": {p.key: p.to_dict()["value"] for p in self.parameters()}
-        }
+        return {"query_parameters": {p.key: p.value_str() for p in self.parameters()}}
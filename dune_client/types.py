@@ -103,6 +103,8 @@ class ParameterType(Enum):
 class QueryParameter:
     """Class whose instances are Dune Compatible Query Parameters"""
 
+    __slots__ = ("key", "type", "value")
+
     def __init__(
         self,
         name: str,
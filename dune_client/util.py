@@ -1,5 +1,25 @@
 """Utility methods for package."""
+import json
 from datetime import datetime
+from typing import Any, Callable
+
+JsonDumps = Callable[[Any], bytes]
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Standard library fallback of orjson.dumps (serializing straight to bytes)"""
+    return json.dumps(obj).encode()
+
+
+# Responses are always decoded with the standard library: orjson turns integers
+# wider than 64 bits (e.g. uint256 amounts in result rows) into lossy floats.
+try:
+    # orjson is an optional (much faster) drop-in for serializing request payloads
+    import orjson
+
+    json_dumps: JsonDumps = orjson.dumps  # pylint: disable=no-member
+except ImportError:  # pragma: no cover
+    json_dumps = _json_dumps
 
 DUNE_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
@@ -1,4 +1,22 @@
+import os
+
 import setuptools
 
+# Opt-in mypyc compilation of response parsing and JSON encoding:
+#   DUNE_CLIENT_MYPYC=1 pip install --no-build-isolation .  (requires mypy)
+# The pure-python package is built otherwise.
+# `types.py` and `query.py` stay pure python: compiled classes with required
+# `__init__` arguments (e.g. `QueryParameter`) can't be copied or pickled.
+COMPILED_MODULES = [
+    "dune_client/models.py",
+    "dune_client/util.py",
+]
+
 if __name__ == "__main__":
-    setuptools.setup()
+    ext_modules = []
+    if os.environ.get("DUNE_CLIENT_MYPYC", "0") == "1":
+        from mypyc.build import mypycify
+
+        ext_modules = mypycify(["--strict", *COMPILED_MODULES])
+
+    setuptools.setup(ext_modules=ext_modules)
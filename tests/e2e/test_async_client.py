@@ -38,6 +38,13 @@ class TestDuneClient(aiounittest.AsyncTestCase):
             results = (await cl.refresh(self.query, performance="large")).get_rows()
         self.assertGreater(len(results), 0)
 
+    async def test_concurrent_refresh(self):
+        async with AsyncDuneClient(self.valid_api_key) as cl:
+            results = await cl.concurrent_refresh([self.query, self.query])
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertGreater(len(result.get_rows()), 0)
+
     async def test_get_latest_result_with_query_object(self):
         async with AsyncDuneClient(self.valid_api_key) as cl:
             results = (await cl.get_latest_result(self.query)).get_rows()
@@ -45,6 +45,18 @@ class TestDuneClient(unittest.TestCase):
         results = dune.refresh(self.query).get_rows()
         self.assertGreater(len(results), 0)
 
+    def test_refresh_context_manager(self):
+        with DuneClient(self.valid_api_key) as dune:
+            results = dune.refresh(self.query).get_rows()
+        self.assertGreater(len(results), 0)
+
+    def test_refresh_many(self):
+        dune = DuneClient(self.valid_api_key)
+        results = dune.refresh_many([self.query, self.query])
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertGreater(len(result.get_rows()), 0)
+
     def test_refresh_performance_large(self):
         dune = DuneClient(self.valid_api_key)
         results = dune.refresh(self.query, performance="large").get_rows()
@@ -55,6 +67,11 @@ class TestDuneClient(unittest.TestCase):
         pd = dune.refresh_into_dataframe(self.query)
         self.assertGreater(len(pd), 0)
 
+    def test_refresh_arrow(self):
+        dune = DuneClient(self.valid_api_key)
+        table = dune.refresh_arrow(self.query)
+        self.assertGreater(table.num_rows, 0)
+
     def test_parameters_recognized(self):
         query = copy.copy(self.query)
         new_params = [
@@ -170,6 +187,13 @@ class TestDuneClient(unittest.TestCase):
         results = dune.get_latest_result(self.query).get_rows()
         self.assertGreater(len(results), 0)
 
+    def test_get_latest_result_cached(self):
+        dune = DuneClient(self.valid_api_key, latest_cache_ttl=60)
+        first = dune.get_latest_result(self.query)
+        self.assertIs(first, dune.get_latest_result(self.query))
+        # different parameters are cached separately
+        self.assertIsNot(first, dune.get_latest_result(self.query.query_id))
+
     def test_get_latest_result_with_query_id(self):
         dune = DuneClient(self.valid_api_key)
         results = dune.get_latest_result(self.query.query_id).get_rows()
@@ -0,0 +1,150 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from dune_client.client_async import AsyncDuneClient
+from dune_client.models import (
+    ExecutionResponse,
+    ExecutionStatusResponse,
+    QueryFailed,
+)
+from dune_client.query import Query
+
+
+class FakeResponse:
+    def __init__(self, status, body, headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.released = False
+
+    async def json(self):
+        return self.body
+
+    def release(self):
+        self.released = True
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    async def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        return self.responses.pop(0)
+
+
+async def no_sleep(_):
+    pass
+
+
+class TestAsyncDuneClient(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dune = AsyncDuneClient("Fake Key")
+
+    @mock.patch("dune_client.client_async.asyncio.sleep", side_effect=no_sleep)
+    def test_retries_rate_limited_requests(self, sleep):
+        limited = FakeResponse(429, {"error": "rate limited"}, {"Retry-After": "2"})
+        self.dune._session = FakeSession(
+            [limited, FakeResponse(429, {}), FakeResponse(200, {"success": True})]
+        )
+        self.assertTrue(asyncio.run(self.dune.cancel_execution("job_id")))
+        self.assertEqual(len(self.dune._session.requests), 3)
+        self.assertTrue(limited.released)
+        # Retry-After is honoured, otherwise backs off
+        self.assertEqual(sleep.call_args_list[0][0][0], 2.0)
+        self.assertGreaterEqual(sleep.call_args_list[1][0][0], self.dune.RETRY_BACKOFF)
+
+    @mock.patch("dune_client.client_async.asyncio.sleep", side_effect=no_sleep)
+    def test_gives_up_after_max_retries(self, _):
+        self.dune.MAX_RETRIES = 1
+        self.dune._session = FakeSession(
+            [FakeResponse(429, {"error": "a"}), FakeResponse(429, {"error": "b"})]
+        )
+        self.assertEqual(asyncio.run(self.dune._get("/route")), {"error": "b"})
+        self.assertEqual(len(self.dune._session.requests), 2)
+
+    def test_gateway_errors_not_retried(self):
+        self.dune._session = FakeSession([FakeResponse(502, {"error": "bad"})])
+        self.assertEqual(asyncio.run(self.dune._post("/route", None)), {"error": "bad"})
+        self.assertEqual(len(self.dune._session.requests), 1)
+
+    def test_long_poll_sends_max_wait(self):
+        body = {
+            "execution_id": "job_id",
+            "query_id": 0,
+            "state": "QUERY_STATE_EXECUTING",
+            "submitted_at": "2022-10-07T10:53:18.822127Z",
+        }
+        self.dune._session = FakeSession([FakeResponse(200, body)])
+        status = asyncio.run(self.dune._wait_for_completion("job_id", max_wait=10))
+        self.assertEqual(status.execution_id, "job_id")
+        method, url, kwargs = self.dune._session.requests[0]
+        self.assertEqual((method, url), ("GET", "/api/v1/execution/job_id/status"))
+        self.assertEqual(kwargs["params"], {"wait": 1, "max_wait": 10})
+        self.assertEqual(kwargs["timeout"].sock_read, 10 + self.dune.DEFAULT_TIMEOUT)
+
+    def test_concurrent_refresh_cancels_others_on_failure(self):
+        cancelled = []
+
+        async def refresh(query, **_):
+            if query.query_id == 1:
+                raise QueryFailed("Error data: failed")
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(query.query_id)
+                raise
+
+        async def concurrent_refresh():
+            with self.assertRaises(QueryFailed):
+                await self.dune.concurrent_refresh([Query(0), Query(1), Query(2)])
+            # Cancelled & awaited before the exception is raised
+            self.assertEqual(sorted(cancelled), [0, 2])
+            self.assertEqual(len(asyncio.all_tasks()), 1)
+
+        self.dune.refresh = refresh
+        asyncio.run(concurrent_refresh())
+
+
+class TestAsyncPingBackoff(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dune = AsyncDuneClient("Fake Key")
+        states = ["PENDING"] * 4 + ["COMPLETED"]
+
+        async def execute(**_):
+            return ExecutionResponse.from_dict(
+                {"execution_id": "job_id", "state": "QUERY_STATE_PENDING"}
+            )
+
+        async def get_status(job_id):
+            return ExecutionStatusResponse.from_dict(
+                {
+                    "execution_id": job_id,
+                    "query_id": 0,
+                    "state": f"QUERY_STATE_{states.pop(0)}",
+                    "submitted_at": "2022-10-07T10:53:18.822127Z",
+                }
+            )
+
+        self.dune.execute = execute
+        self.dune.get_status = get_status
+
+    @mock.patch("dune_client.client_async.asyncio.sleep", side_effect=no_sleep)
+    def test_grows_up_to_ping_frequency(self, sleep):
+        asyncio.run(
+            self.dune._refresh(Query(0), ping_frequency=3, initial_ping_frequency=1)
+        )
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [1, 1.5, 2.25, 3])
+
+    @mock.patch("dune_client.client_async.asyncio.sleep", side_effect=no_sleep)
+    def test_initial_above_ping_frequency(self, sleep):
+        asyncio.run(
+            self.dune._refresh(Query(0), ping_frequency=3, initial_ping_frequency=10)
+        )
+        self.assertEqual([c[0][0] for c in sleep.call_args_list], [3] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,304 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from requests import HTTPError, Response
+from urllib3.util.retry import RequestHistory
+
+from dune_client.client import DuneClient, _DuneRetry, _import_optional
+from dune_client.client_async import AsyncDuneClient
+from dune_client.models import (
+    DuneError,
+    ExecutionResponse,
+    ExecutionStatusResponse,
+    QueryFailed,
+)
+from dune_client.query import Query
+from dune_client.types import QueryParameter
+
+
+def json_response(body: bytes, status_code: int = 200) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = body
+    return response
+
+
+class TestDuneClient(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dune = DuneClient("Fake Key")
+
+    def test_handle_response_keeps_large_integers(self):
+        uint256_max = 2**256 - 1
+        response = json_response(b'{"v": %d}' % uint256_max)
+        value = self.dune._handle_response(response)["v"]
+        self.assertIsInstance(value, int)
+        self.assertEqual(value, uint256_max)
+
+    def test_retry_does_not_resend_posts_on_gateway_errors(self):
+        retry = _DuneRetry(total=5, status_forcelist=[429, 502, 503, 504])
+        for status in [502, 503, 504]:
+            self.assertTrue(retry.is_retry("GET", status))
+            self.assertFalse(retry.is_retry("POST", status))
+        self.assertTrue(retry.is_retry("GET", 429))
+        self.assertTrue(retry.is_retry("POST", 429))
+        self.assertFalse(_DuneRetry(total=0).is_retry("POST", 429))
+
+    @mock.patch("dune_client.client.random.uniform", return_value=0.25)
+    def test_retry_backoff_jitter(self, uniform):
+        retry = _DuneRetry(total=5, backoff_factor=0.5, jitter=0.5)
+        self.assertEqual(retry.get_backoff_time(), 0)
+        error = RequestHistory("GET", "/", None, 429, None)
+        retry = retry.new(history=(error, error, error))
+        # carried over to the retries (urllib3 creates a new one for each)
+        self.assertEqual(retry.jitter, 0.5)
+        self.assertEqual(retry.get_backoff_time(), 0.5 * 2**2 + 0.25)
+        uniform.assert_called_once_with(0, 0.5)
+
+    def test_csv_stream_closed_on_error(self):
+        response = json_response(b"", status_code=500)
+        with mock.patch.object(self.dune._session, "get", return_value=response):
+            with mock.patch.object(response, "close") as close:
+                with self.assertRaises(HTTPError):
+                    self.dune.get_result_csv("job_id")
+        close.assert_called_once()
+
+    def test_retry_adapter_mounted_for_both_schemes(self):
+        dune = DuneClient("Fake Key")
+        for url in ["https://api.dune.com", "http://localhost:8000"]:
+            retry = dune._session.get_adapter(url).max_retries
+            self.assertIsInstance(retry, _DuneRetry)
+            self.assertEqual(retry.total, dune.MAX_RETRIES)
+
+
+class TestLatestResultCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.response_data = {
+            "execution_id": "01GBM4W2N0NMCGPZYW8AYK4YF1",
+            "query_id": 980708,
+            "state": "QUERY_STATE_COMPLETED",
+            "submitted_at": "2022-08-29T06:33:24.913138Z",
+        }
+
+    def client(self, ttl: float) -> DuneClient:
+        dune = DuneClient("Fake Key", latest_cache_ttl=ttl)
+        dune._get = mock.Mock(return_value=self.response_data)
+        return dune
+
+    @mock.patch("dune_client.client.time.monotonic", return_value=0.0)
+    def test_disabled_by_default(self, _):
+        dune = self.client(ttl=0)
+        first = dune.get_latest_result(1)
+        self.assertIsNot(first, dune.get_latest_result(1))
+        self.assertEqual(dune._get.call_count, 2)
+        self.assertEqual(len(dune._latest_cache), 0)
+
+    @mock.patch("dune_client.client.time.monotonic")
+    def test_ttl(self, monotonic):
+        dune = self.client(ttl=30)
+        monotonic.return_value = 0.0
+        first = dune.get_latest_result(1)
+        monotonic.return_value = 29.0
+        self.assertIs(first, dune.get_latest_result(1))
+        self.assertEqual(dune._get.call_count, 1)
+        # expired
+        monotonic.return_value = 30.0
+        self.assertIsNot(first, dune.get_latest_result(1))
+        self.assertEqual(dune._get.call_count, 2)
+
+    @mock.patch("dune_client.client.time.monotonic", return_value=0.0)
+    def test_parameters_cached_separately(self, _):
+        dune = self.client(ttl=30)
+        query = Query(query_id=1, params=[QueryParameter.text_type("Text", "word")])
+        self.assertIsNot(dune.get_latest_result(query), dune.get_latest_result(1))
+        self.assertEqual(dune._get.call_count, 2)
+
+    @mock.patch("dune_client.client.time.monotonic", return_value=0.0)
+    def test_lru_eviction(self, _):
+        dune = self.client(ttl=30)
+        dune.LATEST_CACHE_SIZE = 2
+        first = dune.get_latest_result(1)
+        dune.get_latest_result(2)
+        # touching 1 makes 2 the least recently used entry
+        dune.get_latest_result(1)
+        dune.get_latest_result(3)
+        self.assertEqual([key[0] for key in dune._latest_cache], [1, 3])
+        self.assertIs(first, dune.get_latest_result(1))
+        self.assertEqual(dune._get.call_count, 3)
+
+
+class TestRefreshMany(unittest.TestCase):
+    def test_settings_passed_to_async_client(self):
+        class ProxiedDuneClient(DuneClient):
+            BASE_URL = "https://dune.proxy"
+            MAX_RETRIES = 1
+
+        calls = []
+
+        async def concurrent_refresh(client, queries, **kwargs):
+            calls.append((client, queries, kwargs))
+            return []
+
+        dune = ProxiedDuneClient("Fake Key", supports_long_poll=True)
+        queries = [Query(0), Query(1)]
+        with mock.patch.object(
+            AsyncDuneClient, "concurrent_refresh", concurrent_refresh
+        ):
+            self.assertEqual(dune.refresh_many(queries, initial_ping_frequency=0.5), [])
+
+        client, called_queries, kwargs = calls[0]
+        self.assertEqual(called_queries, queries)
+        self.assertEqual(client.BASE_URL, "https://dune.proxy")
+        self.assertEqual(client.MAX_RETRIES, 1)
+        self.assertTrue(client.supports_long_poll)
+        # Dune's documented parallel request limit for non-pro accounts
+        self.assertEqual(client._connection_limit, 3)
+        self.assertEqual(kwargs["max_concurrency"], 3)
+        self.assertEqual(kwargs["initial_ping_frequency"], 0.5)
+
+    def test_stops_polling_on_first_failure(self):
+        polls = []
+        clients = []
+        # whether the session was closed when a pending refresh got cancelled
+        closed_on_cancel = []
+        real_sleep = asyncio.sleep
+
+        async def execute(_client, query, **_):
+            return ExecutionResponse.from_dict(
+                {"execution_id": str(query.query_id), "state": "QUERY_STATE_PENDING"}
+            )
+
+        async def get_status(client, job_id):
+            polls.append(job_id)
+            clients.append(client)
+            return status("FAILED" if job_id == "1" else "EXECUTING")
+
+        async def sleep(delay):
+            try:
+                await real_sleep(delay)
+            except asyncio.CancelledError:
+                closed_on_cancel.append(clients[0]._session.closed)
+                raise
+
+        with mock.patch.multiple(
+            AsyncDuneClient, execute=execute, get_status=get_status
+        ), mock.patch("dune_client.client_async.asyncio.sleep", side_effect=sleep):
+            with self.assertRaises(QueryFailed):
+                DuneClient("Fake Key").refresh_many([Query(0), Query(1), Query(2)])
+
+        self.assertEqual(sorted(polls), ["0", "1", "2"])
+        self.assertEqual(closed_on_cancel, [False, False])
+
+
+class TestImportOptional(unittest.TestCase):
+    def test_cached(self):
+        self.assertIs(_import_optional("csv"), _import_optional("csv"))
+
+    def test_missing(self):
+        with self.assertRaises(ImportError) as err:
+            _import_optional("not_installed.submodule")
+        self.assertEqual(
+            str(err.exception),
+            "dependency failure, not_installed is required but missing",
+        )
+
+
+def status(state: str) -> ExecutionStatusResponse:
+    return ExecutionStatusResponse.from_dict(
+        {
+            "execution_id": "01GBM4W2N0NMCGPZYW8AYK4YF1",
+            "query_id": 980708,
+            "state": f"QUERY_STATE_{state}",
+            "submitted_at": "2022-08-29T06:33:24.913138Z",
+        }
+    )
+
+
+class TestPingBackoff(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dune = DuneClient("Fake Key")
+        self.dune.execute = mock.Mock(
+            return_value=ExecutionResponse.from_dict(
+                {"execution_id": "job_id", "state": "QUERY_STATE_PENDING"}
+            )
+        )
+        self.dune.get_status = mock.Mock(
+            side_effect=[status("PENDING")] * 6 + [status("COMPLETED")]
+        )
+
+    def sleeps(self, sleep):
+        return [call[0][0] for call in sleep.call_args_list]
+
+    @mock.patch("dune_client.client.time.sleep")
+    def test_grows_up_to_ping_frequency(self, sleep):
+        self.dune._refresh(Query(0), ping_frequency=5, initial_ping_frequency=1)
+        self.assertEqual(self.sleeps(sleep), [1, 1.5, 2.25, 3.375, 5, 5])
+
+    @mock.patch("dune_client.client.time.sleep")
+    def test_backoff_factor(self, sleep):
+        self.dune.PING_BACKOFF = 2
+        self.dune._refresh(Query(0), ping_frequency=10, initial_ping_frequency=1)
+        self.assertEqual(self.sleeps(sleep), [1, 2, 4, 8, 10, 10])
+
+    @mock.patch("dune_client.client.time.sleep")
+    def test_initial_above_ping_frequency(self, sleep):
+        self.dune._refresh(Query(0), ping_frequency=5, initial_ping_frequency=10)
+        self.assertEqual(self.sleeps(sleep), [5] * 6)
+
+    @mock.patch("dune_client.client.time.sleep")
+    def test_constant_by_default(self, sleep):
+        self.dune._refresh(Query(0), ping_frequency=2)
+        self.assertEqual(self.sleeps(sleep), [2] * 6)
+
+
+class TestLongPoll(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dune = DuneClient("Fake Key", supports_long_poll=True)
+        self.dune.execute = mock.Mock(
+            return_value=ExecutionResponse.from_dict(
+                {"execution_id": "job_id", "state": "QUERY_STATE_PENDING"}
+            )
+        )
+        self.dune.get_status = mock.Mock(return_value=status("PENDING"))
+
+    @mock.patch("dune_client.client.time.sleep")
+    def test_backs_off_when_answered_early(self, sleep):
+        self.dune._wait_for_completion = mock.Mock(
+            side_effect=[status("PENDING"), status("PENDING"), status("COMPLETED")]
+        )
+        self.assertEqual(self.dune._refresh(Query(0), ping_frequency=2), "job_id")
+        self.assertEqual(self.dune._wait_for_completion.call_count, 3)
+        self.assertEqual(self.dune.get_status.call_count, 1)
+        # the two early answers without a state change fell back to sleeping
+        self.assertEqual(sleep.call_count, 2)
+        for call in sleep.call_args_list:
+            self.assertGreater(call[0][0], 1.9)
+
+    @mock.patch("dune_client.client.time.sleep")
+    def test_no_sleep_on_state_change(self, sleep):
+        self.dune._wait_for_completion = mock.Mock(
+            side_effect=[status("EXECUTING"), status("COMPLETED")]
+        )
+        self.assertEqual(self.dune._refresh(Query(0)), "job_id")
+        self.assertEqual(self.dune._wait_for_completion.call_count, 2)
+        sleep.assert_not_called()
+
+    @mock.patch("dune_client.client.time.sleep")
+    def test_disabled(self, sleep):
+        self.dune.supports_long_poll = False
+        self.dune._wait_for_completion = mock.Mock()
+        self.dune.get_status.side_effect = [status("PENDING"), status("COMPLETED")]
+        self.dune._refresh(Query(0))
+        self.dune._wait_for_completion.assert_not_called()
+        sleep.assert_called_once_with(5)
+
+    def test_max_wait_sent_to_server(self):
+        with mock.patch.object(self.dune._session, "get") as get:
+            get.return_value = json_response(b"{}")
+            with self.assertRaises(DuneError):
+                self.dune._wait_for_completion("job_id", max_wait=10)
+        self.assertEqual(get.call_args[1]["params"], {"wait": 1, "max_wait": 10})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -89,6 +89,20 @@ eth_traces,4474223
             expected, ExecutionResponse.from_dict(self.execution_response_data)
         )
 
+    def test_terminal_states(self):
+        self.assertEqual(
+            ExecutionState.terminal_states(),
+            {
+                ExecutionState.COMPLETED,
+                ExecutionState.CANCELLED,
+                ExecutionState.FAILED,
+            },
+        )
+        self.assertIs(
+            ExecutionState.terminal_states(), ExecutionState.terminal_states()
+        )
+        self.assertEqual(len(ExecutionState), 5)
+
     def test_parse_time_data(self):
         expected_with_end = TimeData(
             submitted_at=parse(self.submission_time_str),
@@ -197,6 +211,10 @@ eth_traces,4474223
             expected, ExecutionResult.from_dict(self.results_response_data["result"])
         )
 
+    def test_parse_execution_result_does_not_copy_rows(self):
+        data = self.results_response_data["result"]
+        self.assertIs(data["rows"], ExecutionResult.from_dict(data).rows)
+
     def test_parse_result_response(self):
         # Time data parsing tested above in test_time_data_parsing.
         time_data = TimeData.from_dict(self.results_response_data)
@@ -226,6 +244,11 @@ eth_traces,4474223
             [r for r in result],
         )
 
+    def test_execution_result_csv_close(self):
+        with ExecutionResultCSV(data=BytesIO(b"TableName,ct")) as csv_response:
+            self.assertFalse(csv_response.data.closed)
+        self.assertTrue(csv_response.data.closed)
+
 
 if __name__ == "__main__":
     unittest.main()
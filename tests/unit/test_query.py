@@ -1,3 +1,5 @@
+import copy
+import pickle
 import unittest
 from datetime import datetime
 
@@ -56,6 +58,14 @@ class TestQueryMonitor(unittest.TestCase):
         query2 = Query(query_id=1, params=[QueryParameter.number_type("num", 1)])
         self.assertNotEqual(hash(query1), hash(query2))
 
+    def test_copy_and_pickle(self):
+        for query in [copy.copy(self.query), copy.deepcopy(self.query)]:
+            self.assertEqual(query, self.query)
+            self.assertEqual(query.request_format(), self.query.request_format())
+        unpickled = pickle.loads(pickle.dumps(self.query))
+        self.assertEqual(unpickled, self.query)
+        self.assertEqual(hash(unpickled), hash(self.query))
+
 
 if __name__ == "__main__":
     unittest.main()
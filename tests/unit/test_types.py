@@ -1,4 +1,6 @@
+import copy
 import datetime
+import pickle
 import unittest
 
 from dune_client.query import Query
@@ -68,6 +70,18 @@ class TestQueryParameter(unittest.TestCase):
             {"key": "Date", "type": "datetime", "value": "2022-03-10 00:00:00"},
         )
 
+    def test_slots(self):
+        param = QueryParameter.text_type("Text", "plain text")
+        self.assertFalse(hasattr(param, "__dict__"))
+        with self.assertRaises(AttributeError):
+            param.other = 1
+
+    def test_copy_and_pickle(self):
+        for param in [self.number_type, self.text_type, self.date_type]:
+            self.assertEqual(copy.copy(param), param)
+            self.assertEqual(copy.deepcopy(param), param)
+            self.assertEqual(pickle.loads(pickle.dumps(param)), param)
+
     def test_repr_method(self):
         query = Query(
             query_id=1,